@@ -4,186 +4,220 @@ Frontend Code Detector
 Analyzes TypeScript/React frontend code for schema compliance
 """
 
-import json
-import os
 import re
-import sys
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Any
-
-class FrontendDetector:
-    def __init__(self, frontend_dir: str, schema_path: str):
+from typing import Dict, List, Any, Tuple
+from common import (RESERVED_KEYS, SourceDetector, dump_results, load_entity, search_word,
+                    to_camel_case, to_pascal_case)
+
+# Schema field type -> TypeScript type
+_TS_TYPE_MAP = {
+    'string': 'string',
+    'text': 'string',
+    'integer': 'number',
+    'number': 'number',
+    'boolean': 'boolean',
+    'enum': 'string',
+    'datetime': 'Date',
+    'password': 'string',
+    'uid': 'string',
+    'version': 'number',
+    'json': 'any',
+}
+
+# Field declaration patterns, shared by every detector in the process
+_FIELD_RX_CACHE: Dict[Tuple[str, str], re.Pattern] = {}
+
+def _field_regex(camel: str, ts_type: str) -> re.Pattern:
+    """Return the compiled declaration pattern for a camelCase field"""
+    key = (camel, ts_type)
+    pattern = _FIELD_RX_CACHE.get(key)
+    if pattern is None:
+        # Anchored on both sides so `name` no longer matches inside `username`;
+        # the left boundary is checked by search_word
+        pattern = re.compile(rf'{re.escape(camel)}\??\s*:?\s*\b{re.escape(ts_type)}\b'.encode())
+        _FIELD_RX_CACHE[key] = pattern
+    return pattern
+
+@dataclass
+class EntityFields:
+    """An entity's properties bucketed once for all frontend checks"""
+    typed: List[Tuple[str, str]]  # (field, TypeScript type)
+    enums: List[str]              # enum fields with declared values
+    required: List[str]
+    columns: List[str]            # every field, in schema order
+
+class FrontendDetector(SourceDetector):
+    # CRUD methods every API client should expose
+    API_METHODS = ['create', 'get', 'update', 'delete', 'list']
+
+    # Report line for each result code
+    MESSAGES = {
+        'TYPES_FILE_MISSING': "❌ Types file missing: {detail}",
+        'MISSING_TYPE_FIELD': "❌ {entity} Types: Missing field '{detail}'",
+        'MISSING_ENUM': "⚠️  {entity} Types: Missing enum definition for '{detail}'",
+        'API_FILE_MISSING': "❌ API file missing: {detail}",
+        'MISSING_API_METHOD': "⚠️  {entity} API: Missing {detail} method",
+        'MISSING_API_ERROR_HANDLING': "⚠️  {entity} API: Missing error handling",
+        'MISSING_API_PROMISE': "⚠️  {entity} API: Missing Promise return types",
+        'FORM_MISSING': "⚠️  {entity} Form: Component missing (optional)",
+        'MISSING_ZOD_SCHEMA': "❌ {entity} Form: Missing Zod schema",
+        'MISSING_FORM_FIELD': "⚠️  {entity} Form: Missing field '{detail}'",
+        'MISSING_FORM_HOOK': "⚠️  {entity} Form: Missing React Hook Form integration",
+        'MISSING_FORM_ERRORS': "⚠️  {entity} Form: Missing error display",
+        'TABLE_MISSING': "⚠️  {entity} Table: Component missing (optional)",
+        'MISSING_TABLE_COLUMN': "⚠️  {entity} Table: Missing column '{detail}'",
+        'MISSING_TABLE_LOADING': "⚠️  {entity} Table: Missing loading state",
+        'MISSING_TABLE_EMPTY': "⚠️  {entity} Table: Missing empty state",
+        'MISSING_TABLE_PAGINATION': "⚠️  {entity} Table: Missing pagination",
+    }
+
+    def __init__(self, frontend_dir: str, schema_path: str = None, *, schema: Dict = None):
+        super().__init__(schema_path, schema=schema)
         self.frontend_dir = Path(frontend_dir)
-        self.schema = self._load_schema(schema_path)
-        self.issues = []
-        self.warnings = []
-
-    def _load_schema(self, path: str) -> Dict:
-        with open(path, 'r') as f:
-            return json.load(f)
 
-    def analyze_entity(self, entity_name: str):
+    def _classify(self, entity: str) -> EntityFields:
+        """Bucket an entity's properties by what the checks look for"""
+        fields = self._classified.get(entity)
+        if fields is None:
+            fields = EntityFields(typed=[], enums=[], required=[], columns=[])
+            properties = self.schema.get(entity, {}).get('properties', {})
+            for prop_name, prop_def in properties.items():
+                field_type = prop_def.get('type')
+                validations = prop_def.get('validate', {})
+                ts_type = self._map_to_ts_type(field_type)
+                if ts_type:
+                    fields.typed.append((prop_name, ts_type))
+                if field_type == 'enum' and validations.get('enum'):
+                    fields.enums.append(prop_name)
+                if validations.get('required'):
+                    fields.required.append(prop_name)
+                fields.columns.append(prop_name)
+            self._classified[entity] = fields
+        return fields
+
+    def analyze_entity(self, entity_name: str, print_results: bool = True):
         """Analyze all frontend components for an entity"""
-        print(f"\n=== Analyzing {entity_name} ===")
-
         self._check_types(entity_name)
         self._check_api(entity_name)
         self._check_form(entity_name)
         self._check_table(entity_name)
 
-        self._print_results()
+        if print_results:
+            self._print_results(entity_name)
 
     def _check_types(self, entity: str):
         """Check TypeScript type definitions"""
         types_file = self.frontend_dir / 'types' / f"{entity.lower()}.ts"
-        if not types_file.exists():
-            self.issues.append(f"❌ Types file missing: {types_file}")
+        if not self._exists(types_file):
+            self.issues.append(('TYPES_FILE_MISSING', entity, str(types_file)))
             return
 
-        content = types_file.read_text()
-        properties = self.schema.get(entity, {}).get('properties', {})
+        content = self._read(types_file)
+        fields = self._classify(entity)
 
         # Check all fields are present
-        for prop_name, prop_def in properties.items():
-            ts_type = self._map_to_ts_type(prop_def.get('type'))
-            if ts_type:
-                # Check if field exists
-                pattern = rf'{self._to_camel_case(prop_name)}\s*[?:]?\s*{ts_type}'
-                if not re.search(pattern, content):
-                    self.issues.append(f"❌ {entity} Types: Missing field '{prop_name}'")
-
-        # Check enum types
-        for prop_name, prop_def in properties.items():
-            if prop_def.get('type') == 'enum':
-                enum_values = prop_def.get('validate', {}).get('enum', [])
-                if enum_values:
-                    # Check if enum is defined
-                    enum_pattern = rf'enum {self._to_pascal_case(prop_name)}'
-                    if not re.search(enum_pattern, content):
-                        self.warnings.append(f"⚠️  {entity} Types: Missing enum definition for '{prop_name}'")
+        for prop_name, ts_type in fields.typed:
+            if not search_word(_field_regex(to_camel_case(prop_name), ts_type), content):
+                self.issues.append(('MISSING_TYPE_FIELD', entity, prop_name))
+
+        # Check enum types are defined
+        for prop_name in fields.enums:
+            if not search_word(self._get_enum_pattern(prop_name), content):
+                self.warnings.append(('MISSING_ENUM', entity, prop_name))
+
+    def _get_enum_pattern(self, prop_name: str) -> re.Pattern:
+        """Return the compiled enum definition pattern, compiling it on first use"""
+        key = ('enum', prop_name)
+        pattern = self._pattern_cache.get(key)
+        if pattern is None:
+            pattern = re.compile(rf'enum\s+{re.escape(to_pascal_case(prop_name))}\b'.encode())
+            self._pattern_cache[key] = pattern
+        return pattern
 
     def _check_api(self, entity: str):
         """Check API client"""
         api_file = self.frontend_dir / 'lib' / 'api' / f"{entity.lower()}.ts"
-        if not api_file.exists():
-            self.issues.append(f"❌ API file missing: {api_file}")
+        if not self._exists(api_file):
+            self.issues.append(('API_FILE_MISSING', entity, str(api_file)))
             return
 
-        content = api_file.read_text()
+        content = self._read(api_file)
 
         # Check CRUD methods
-        required_methods = ['create', 'get', 'update', 'delete', 'list']
-        for method in required_methods:
-            if f'{method}' not in content:
-                self.warnings.append(f"⚠️  {entity} API: Missing {method} method")
+        for method in self.API_METHODS:
+            if content.find(method.encode()) == -1:
+                self.warnings.append(('MISSING_API_METHOD', entity, method))
 
         # Check error handling
-        if 'try' not in content or 'catch' not in content:
-            self.warnings.append(f"⚠️  {entity} API: Missing error handling")
+        if content.find(b'try') == -1 or content.find(b'catch') == -1:
+            self.warnings.append(('MISSING_API_ERROR_HANDLING', entity, None))
 
         # Check response types
-        if 'Promise' not in content:
-            self.warnings.append(f"⚠️  {entity} API: Missing Promise return types")
+        if content.find(b'Promise') == -1:
+            self.warnings.append(('MISSING_API_PROMISE', entity, None))
 
     def _check_form(self, entity: str):
         """Check Form component"""
-        form_file = self.frontend_dir / 'components' / f"{self._to_pascal_case(entity)}Form.tsx"
-        if not form_file.exists():
-            self.warnings.append(f"⚠️  {entity} Form: Component missing (optional)")
+        form_file = self.frontend_dir / 'components' / f"{to_pascal_case(entity)}Form.tsx"
+        if not self._exists(form_file):
+            self.warnings.append(('FORM_MISSING', entity, None))
             return
 
-        content = form_file.read_text()
-        properties = self.schema.get(entity, {}).get('properties', {})
+        content = self._read(form_file)
+        fields = self._classify(entity)
 
         # Check Zod schema
-        if 'z.object' not in content:
-            self.issues.append(f"❌ {entity} Form: Missing Zod schema")
+        if content.find(b'z.object') == -1:
+            self.issues.append(('MISSING_ZOD_SCHEMA', entity, None))
 
-        # Check all fields rendered
-        for prop_name, prop_def in properties.items():
-            if prop_def.get('validate', {}).get('required'):
-                # Should be in form
-                if prop_name.lower() not in content.lower():
-                    self.warnings.append(f"⚠️  {entity} Form: Missing field '{prop_name}'")
+        # Check all required fields rendered, in any case
+        content_lower = bytes(content).lower()
+        for prop_name in fields.required:
+            if prop_name.lower().encode() not in content_lower:
+                self.warnings.append(('MISSING_FORM_FIELD', entity, prop_name))
 
         # Check validation integration
-        if 'useForm' not in content:
-            self.warnings.append(f"⚠️  {entity} Form: Missing React Hook Form integration")
+        if content.find(b'useForm') == -1:
+            self.warnings.append(('MISSING_FORM_HOOK', entity, None))
 
         # Check error display
-        if 'error' not in content:
-            self.warnings.append(f"⚠️  {entity} Form: Missing error display")
+        if content.find(b'error') == -1:
+            self.warnings.append(('MISSING_FORM_ERRORS', entity, None))
 
     def _check_table(self, entity: str):
         """Check Table component"""
-        table_file = self.frontend_dir / 'components' / f"{self._to_pascal_case(entity)}Table.tsx"
-        if not table_file.exists():
-            self.warnings.append(f"⚠️  {entity} Table: Component missing (optional)")
+        table_file = self.frontend_dir / 'components' / f"{to_pascal_case(entity)}Table.tsx"
+        if not self._exists(table_file):
+            self.warnings.append(('TABLE_MISSING', entity, None))
             return
 
-        content = table_file.read_text()
-        properties = self.schema.get(entity, {}).get('properties', {})
+        content = self._read(table_file)
+        fields = self._classify(entity)
+        # Lowercased once for all case-insensitive checks below
+        content_lower = bytes(content).lower()
 
         # Check column definitions
-        for prop_name in properties.keys():
-            if prop_name.lower() not in content.lower():
-                self.warnings.append(f"⚠️  {entity} Table: Missing column '{prop_name}'")
+        for prop_name in fields.columns:
+            if prop_name.lower().encode() not in content_lower:
+                self.warnings.append(('MISSING_TABLE_COLUMN', entity, prop_name))
 
         # Check loading state
-        if 'loading' not in content:
-            self.warnings.append(f"⚠️  {entity} Table: Missing loading state")
+        if content.find(b'loading') == -1:
+            self.warnings.append(('MISSING_TABLE_LOADING', entity, None))
 
         # Check empty state
-        if 'empty' not in content.lower():
-            self.warnings.append(f"⚠️  {entity} Table: Missing empty state")
+        if b'empty' not in content_lower:
+            self.warnings.append(('MISSING_TABLE_EMPTY', entity, None))
 
         # Check pagination
-        if 'pagination' not in content.lower():
-            self.warnings.append(f"⚠️  {entity} Table: Missing pagination")
-
-    def _print_results(self):
-        """Print analysis results"""
-        if self.issues:
-            print("\n❌ Issues Found:")
-            for issue in self.issues:
-                print(f"  {issue}")
-
-        if self.warnings:
-            print("\n⚠️  Warnings:")
-            for warning in self.warnings:
-                print(f"  {warning}")
-
-        if not self.issues and not self.warnings:
-            print("\n✅ All checks passed!")
-
-        # Summary
-        print(f"\nSummary: {len(self.issues)} errors, {len(self.warnings)} warnings")
-
-    def _to_camel_case(self, name: str) -> str:
-        """Convert field name to camelCase"""
-        words = name.split('_')
-        return words[0] + ''.join(word.capitalize() for word in words[1:])
-
-    def _to_pascal_case(self, name: str) -> str:
-        """Convert field name to PascalCase"""
-        return ''.join(word.capitalize() for word in name.split('_'))
+        if b'pagination' not in content_lower:
+            self.warnings.append(('MISSING_TABLE_PAGINATION', entity, None))
 
     def _map_to_ts_type(self, field_type: str) -> str:
         """Map schema type to TypeScript type"""
-        mapping = {
-            'string': 'string',
-            'text': 'string',
-            'integer': 'number',
-            'number': 'number',
-            'boolean': 'boolean',
-            'enum': 'string',
-            'datetime': 'Date',
-            'password': 'string',
-            'uid': 'string',
-            'version': 'number',
-            'json': 'any',
-        }
-        return mapping.get(field_type, '')
+        return _TS_TYPE_MAP.get(field_type, '')
 
 def main():
     import argparse
@@ -192,21 +226,31 @@ def main():
     parser.add_argument('frontend_dir', help='Frontend directory path')
     parser.add_argument('--schema', required=True, help='Schema file path')
     parser.add_argument('--entity', help='Specific entity to analyze')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
 
     args = parser.parse_args()
 
-    detector = FrontendDetector(args.frontend_dir, args.schema)
-
     if args.entity:
-        detector.analyze_entity(args.entity)
+        # Only the requested entity is parsed out of the schema file
+        schema = {args.entity: load_entity(args.schema, args.entity)}
+        detector = FrontendDetector(args.frontend_dir, schema=schema)
+        entities = [args.entity]
     else:
         # Analyze all entities
-        schema = detector.schema
-        for entity_name in schema.keys():
-            if entity_name not in ['presets', 'features']:
-                detector.analyze_entity(entity_name)
-                detector.issues = []
-                detector.warnings = []
+        detector = FrontendDetector(args.frontend_dir, args.schema)
+        entities = [k for k in detector.schema if k not in RESERVED_KEYS]
+
+    issues = []
+    warnings = []
+    for entity_name in entities:
+        detector.analyze_entity(entity_name, print_results=not args.json)
+        issues.extend(detector.issues)
+        warnings.extend(detector.warnings)
+        detector.issues.clear()
+        detector.warnings.clear()
+
+    if args.json:
+        print(dump_results(issues, warnings))
 
 if __name__ == '__main__':
     main()
@@ -3,6 +3,11 @@ import json
 import os
 import sys
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 def create_schema(name: str, output_path: str):
     """
     Create a new schema file from the template.
@@ -17,8 +22,12 @@ def create_schema(name: str, output_path: str):
             return False
 
         # Load template
-        with open(template_path, 'r', encoding='utf-8') as f:
-            template = json.load(f)
+        if orjson is not None:
+            with open(template_path, 'rb') as f:
+                template = orjson.loads(f.read())
+        else:
+            with open(template_path, 'r', encoding='utf-8') as f:
+                template = json.load(f)
 
         # Customize
         template['name'] = name
@@ -30,8 +39,12 @@ def create_schema(name: str, output_path: str):
             os.makedirs(output_dir)
 
         # Write file
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(template, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(template, option=orjson.OPT_INDENT_2))
+        else:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(template, f, indent=2, ensure_ascii=False)
 
         print(f"✅ Schema created successfully at: {output_path}")
         print(f"   Entity Name: {name}")
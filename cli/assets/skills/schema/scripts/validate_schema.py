@@ -1,14 +1,118 @@
 import argparse
+import functools
+import hashlib
 import json
 import os
 import sys
+import tempfile
+import urllib.error
 import urllib.request
 from typing import Dict, Any
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 def load_json(path: str) -> Dict[str, Any]:
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
     with open(path, 'r', encoding='utf-8') as f:
         return json.load(f)
 
+def _parse_json(body: bytes) -> Dict[str, Any]:
+    return orjson.loads(body) if orjson is not None else json.loads(body.decode())
+
+# Remote master schemas are cached here between runs
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'leeforge')
+
+def _cache_paths(url: str):
+    key = hashlib.sha1(url.encode()).hexdigest()
+    return os.path.join(CACHE_DIR, f"{key}.json"), os.path.join(CACHE_DIR, f"{key}.meta.json")
+
+def _write_atomic(path: str, data: bytes):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def fetch_remote_schema(url: str) -> Dict[str, Any]:
+    """
+    Fetch and parse a remote master schema, revalidating the cached copy
+    with ETag / Last-Modified so an unchanged schema is not downloaded again.
+    """
+    body_path, meta_path = _cache_paths(url)
+
+    # Any problem with the cache, including a cached body that no longer
+    # parses, just means doing a plain fetch without conditional headers
+    cached, meta = None, {}
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        with open(body_path, 'rb') as f:
+            cached = _parse_json(f.read())
+    except (OSError, ValueError):
+        cached, meta = None, {}
+
+    headers = {}
+    if cached is not None:
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers)) as response:
+            body = response.read()
+            meta = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+            }
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and cached is not None:
+            return cached
+        raise
+
+    # Parsed before caching, so a truncated download is never stored
+    schema = _parse_json(body)
+
+    # Body first, so the stored validators never describe a stale body
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        _write_atomic(body_path, body)
+        _write_atomic(meta_path, json.dumps(meta).encode())
+    except OSError:
+        pass
+
+    return schema
+
+@functools.lru_cache(maxsize=None)
+def load_master_schema(master_schema_path: str) -> Dict[str, Any]:
+    """
+    Load the master schema from a local path or URL, once per process.
+    """
+    if master_schema_path.startswith('http'):
+        return fetch_remote_schema(master_schema_path)
+    return load_json(master_schema_path)
+
+@functools.lru_cache(maxsize=None)
+def get_validator(master_schema_path: str):
+    """
+    Build the jsonschema validator for a master schema, once per process.
+    Raises ImportError when jsonschema is not installed.
+    """
+    from jsonschema.validators import validator_for
+
+    schema = load_master_schema(master_schema_path)
+    cls = validator_for(schema)
+    cls.check_schema(schema)
+    return cls(schema)
+
 def validate_schema(schema_path: str, master_schema_path: str = None):
     """
     Validate a schema file against the Leeforge master schema.
@@ -37,19 +141,18 @@ def validate_schema(schema_path: str, master_schema_path: str = None):
                 print("⚠️  Local master schema.json not found, using remote...")
                 master_schema_path = "https://raw.githubusercontent.com/leeforge/schema/main/schema.json"
 
-        # Load master schema
-        if master_schema_path.startswith('http'):
-            with urllib.request.urlopen(master_schema_path) as url:
-                schema = json.loads(url.read().decode())
-        else:
-            schema = load_json(master_schema_path)
+        # Load master schema up front, so a missing file or failed fetch is
+        # reported even when jsonschema is not installed; get_validator
+        # reuses this cached result
+        load_master_schema(master_schema_path)
 
         # Try to import jsonschema for strict validation
         try:
-            from jsonschema import validate
-            from jsonschema.exceptions import ValidationError
+            from jsonschema.exceptions import ValidationError, best_match
 
-            validate(instance=instance, schema=schema)
+            error = best_match(get_validator(master_schema_path).iter_errors(instance))
+            if error is not None:
+                raise error
             print(f"✅ Schema '{schema_path}' is valid!")
             return True
 
@@ -77,10 +180,12 @@ def validate_schema(schema_path: str, master_schema_path: str = None):
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Validate a Leeforge entity schema")
-    parser.add_argument("path", help="Path to the schema file to validate")
+    parser.add_argument("path", nargs='+', help="Path(s) to the schema file(s) to validate")
     parser.add_argument("--master", help="Path or URL to the master schema.json", default=None)
 
     args = parser.parse_args()
 
-    success = validate_schema(args.path, args.master)
+    # Validate every file, reusing the same master schema and validator
+    results = [validate_schema(path, args.master) for path in args.path]
+    success = all(results)
     sys.exit(0 if success else 1)
@@ -4,46 +4,114 @@ Full Stack Code Analyzer
 Analyzes both backend and frontend code for schema compliance
 """
 
-import json
+import contextlib
+import io
 import os
 import sys
-from pathlib import Path
+from common import RESERVED_KEYS, dump_results, load_entity, load_schema
 from detect_backend import BackendDetector
 from detect_frontend import FrontendDetector
 
-def analyze_all(backend_dir: str, frontend_dir: str, schema_path: str, entity: str = None):
-    """Analyze both backend and frontend"""
+# Below this many entities a worker pool costs more to start than it saves
+PARALLEL_MIN_ENTITIES = 200
+
+# Detectors shared by every entity analyzed in this process
+_detectors = None
+# Whether _analyze_one prints the text report, and whether it captures that
+# report for the parent process rather than writing it to stdout directly
+_report = True
+_capture_report = False
+
+def _init_detectors(backend_dir: str, frontend_dir: str, schema: dict, report: bool = True,
+                    capture_report: bool = False):
+    """Create this process's detectors from the already parsed schema"""
+    global _detectors, _report, _capture_report
+    _detectors = (
+        BackendDetector(backend_dir, schema=schema),
+        FrontendDetector(frontend_dir, schema=schema),
+    )
+    _report = report
+    _capture_report = capture_report
+
+def _analyze_one(entity_name: str) -> tuple:
+    """Analyze a single entity, returning its captured output and results"""
+    backend_detector, frontend_detector = _detectors
+
+    output = io.StringIO()
+    if not _report:
+        backend_detector.analyze_entity(entity_name, print_results=False)
+        frontend_detector.analyze_entity(entity_name, print_results=False)
+    else:
+        # Only pool workers capture; inline runs print each entity as it goes
+        target = contextlib.redirect_stdout(output) if _capture_report else contextlib.nullcontext()
+        with target:
+            print(f"\n{'='*60}")
+            print(f"ENTITY: {entity_name}")
+            print(f"{'='*60}")
 
-    print("=" * 60)
-    print("FULL STACK CODE ANALYSIS")
-    print("=" * 60)
+            # Backend analysis
+            print("\n--- BACKEND ---")
+            backend_detector.analyze_entity(entity_name)
 
-    # Load schema
-    with open(schema_path, 'r') as f:
-        schema = json.load(f)
+            # Frontend analysis
+            print("\n--- FRONTEND ---")
+            frontend_detector.analyze_entity(entity_name)
 
-    entities = [entity] if entity else [k for k in schema.keys() if k not in ['presets', 'features']]
+    issues = backend_detector.issues + frontend_detector.issues
+    warnings = backend_detector.warnings + frontend_detector.warnings
 
-    total_issues = 0
-    total_warnings = 0
+    for detector in _detectors:
+        detector.issues.clear()
+        detector.warnings.clear()
 
-    for entity_name in entities:
-        print(f"\n{'='*60}")
-        print(f"ENTITY: {entity_name}")
-        print(f"{'='*60}")
+    return output.getvalue(), issues, warnings
+
+def analyze_all(backend_dir: str, frontend_dir: str, schema_path: str, entity: str = None,
+                as_json: bool = False):
+    """Analyze both backend and frontend"""
 
-        # Backend analysis
-        print("\n--- BACKEND ---")
-        backend_detector = BackendDetector(backend_dir, schema_path)
-        backend_detector.analyze_entity(entity_name)
+    if not as_json:
+        print("=" * 60)
+        print("FULL STACK CODE ANALYSIS")
+        print("=" * 60)
+
+    # Load schema; a single requested entity is parsed on its own
+    if entity:
+        schema = {entity: load_entity(schema_path, entity)}
+    else:
+        schema = load_schema(schema_path)
+
+    entities = [entity] if entity else [k for k in schema if k not in RESERVED_KEYS]
+
+    all_issues = []
+    all_warnings = []
+
+    # Entities are independent, so large schemas are analyzed in parallel when
+    # there is more than one CPU; results come back in submission order
+    workers = min(len(entities), os.cpu_count() or 1)
+    if workers > 1 and len(entities) >= PARALLEL_MIN_ENTITIES:
+        from concurrent.futures import ProcessPoolExecutor
+
+        init_args = (backend_dir, frontend_dir, schema, not as_json, True)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_detectors,
+                                 initargs=init_args) as executor:
+            for output, issues, warnings in executor.map(_analyze_one, entities):
+                sys.stdout.write(output)
+                all_issues.extend(issues)
+                all_warnings.extend(warnings)
+    else:
+        _init_detectors(backend_dir, frontend_dir, schema, not as_json)
+        for entity_name in entities:
+            _, issues, warnings = _analyze_one(entity_name)
+            all_issues.extend(issues)
+            all_warnings.extend(warnings)
 
-        # Frontend analysis
-        print("\n--- FRONTEND ---")
-        frontend_detector = FrontendDetector(frontend_dir, schema_path)
-        frontend_detector.analyze_entity(entity_name)
+    total_issues = len(all_issues)
+    total_warnings = len(all_warnings)
 
-        total_issues += len(backend_detector.issues) + len(frontend_detector.issues)
-        total_warnings += len(backend_detector.warnings) + len(frontend_detector.warnings)
+    if as_json:
+        print(dump_results(all_issues, all_warnings))
+        sys.exit(1 if total_issues > 0 else 0)
 
     # Final summary
     print(f"\n{'='*60}")
@@ -70,10 +138,11 @@ def main():
     parser.add_argument('frontend_dir', help='Frontend directory path')
     parser.add_argument('--schema', required=True, help='Schema file path')
     parser.add_argument('--entity', help='Specific entity to analyze')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
 
     args = parser.parse_args()
 
-    analyze_all(args.backend_dir, args.frontend_dir, args.schema, args.entity)
+    analyze_all(args.backend_dir, args.frontend_dir, args.schema, args.entity, args.json)
 
 if __name__ == '__main__':
     main()
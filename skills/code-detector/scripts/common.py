@@ -0,0 +1,142 @@
+"""
+Code Detector Common
+Schema loading, naming and cached source reads shared by the analyzers
+"""
+
+import functools
+import json
+import mmap
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Top-level schema keys that are not entities
+RESERVED_KEYS = frozenset({'presets', 'features'})
+
+def load_schema(path: str) -> Dict:
+    """Load the whole schema file"""
+    if orjson is not None:
+        return orjson.loads(Path(path).read_bytes())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def load_entity(path: str, entity: str) -> Dict:
+    """Load a single entity's definition, streaming it out when orjson is missing"""
+    # A full orjson parse beats streaming unless the entity is near the top
+    if orjson is None and ijson is not None:
+        with open(path, 'rb') as f:
+            # Stop at the first match; the rest of the file is never parsed
+            for definition in ijson.items(f, entity, use_float=True):
+                return definition
+        return {}
+    return load_schema(path).get(entity, {})
+
+def dump_results(issues: List[tuple], warnings: List[tuple]) -> str:
+    """Serialize structured results as JSON"""
+    results = {'issues': issues, 'warnings': warnings}
+    if orjson is not None:
+        return orjson.dumps(results).decode()
+    return json.dumps(results, ensure_ascii=False)
+
+@functools.lru_cache(maxsize=None)
+def to_camel_case(name: str) -> str:
+    """Convert field name to camelCase"""
+    words = name.split('_')
+    return words[0] + ''.join(word.capitalize() for word in words[1:])
+
+@functools.lru_cache(maxsize=None)
+def to_pascal_case(name: str) -> str:
+    """Convert field name to PascalCase"""
+    return ''.join(word.capitalize() for word in name.split('_'))
+
+# Bytes that a bytes pattern's \b treats as word characters
+_WORD_BYTES = frozenset(b'0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ_abcdefghijklmnopqrstuvwxyz')
+
+def search_word(pattern: re.Pattern, content: Union[bytes, mmap.mmap],
+                pos: int = 0) -> Optional[re.Match]:
+    """Return the first match at or after pos that does not start mid-word
+
+    Stands in for a leading \\b, which stops re from jumping straight to the
+    pattern's literal prefix and makes it try a match at every offset.
+    """
+    match = pattern.search(content, pos)
+    while match and match.start() and content[match.start() - 1] in _WORD_BYTES:
+        match = pattern.search(content, match.start() + 1)
+    return match
+
+class SourceDetector:
+    """Schema, results and cached file access shared by the detectors"""
+
+    # Files at least this large are memory-mapped rather than read
+    MMAP_THRESHOLD = 16 * 1024
+
+    # Message templates for the (code, entity, detail) results, formatted only
+    # when printed; detail is a schema field, a file path or a method name,
+    # depending on the code
+    MESSAGES: Dict[str, str] = {}
+
+    def __init__(self, schema_path: str = None, *, schema: Dict = None):
+        # Callers that already parsed the schema can pass it in directly
+        self.schema = schema if schema is not None else load_schema(schema_path)
+        self.issues = []
+        self.warnings = []
+        self._pattern_cache = {}
+        self._classified = {}
+        self._dir_cache = {}
+
+    def _exists(self, path: Path) -> bool:
+        """Check for a file against a single cached listing of its directory"""
+        names = self._dir_cache.get(path.parent)
+        if names is None:
+            try:
+                with os.scandir(path.parent) as entries:
+                    # is_file() follows symlinks, so dangling links are left out
+                    names = {entry.name for entry in entries if entry.is_file()}
+            except OSError:
+                names = set()
+            self._dir_cache[path.parent] = names
+        return path.name in names
+
+    def _read(self, path: Path) -> Union[bytes, mmap.mmap]:
+        """Read a source file as bytes, mapping large files instead of copying them"""
+        with open(path, 'rb') as f:
+            # Large files are scanned straight from the page cache; the map is
+            # released as soon as the calling check drops it
+            if os.fstat(f.fileno()).st_size >= self.MMAP_THRESHOLD:
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return f.read()
+
+    def _format(self, code: str, entity: str, detail: str = None) -> str:
+        """Render a structured result as its report line"""
+        return self.MESSAGES[code].format(entity=entity, detail=detail)
+
+    def _print_results(self, entity_name: str):
+        """Print analysis results"""
+        # Collected first and written in one call rather than a print per line
+        lines = [f"\n=== Analyzing {entity_name} ==="]
+        if self.issues:
+            lines.append("\n❌ Issues Found:")
+            lines.extend(f"  {self._format(*issue)}" for issue in self.issues)
+
+        if self.warnings:
+            lines.append("\n⚠️  Warnings:")
+            lines.extend(f"  {self._format(*warning)}" for warning in self.warnings)
+
+        if not self.issues and not self.warnings:
+            lines.append("\n✅ All checks passed!")
+
+        # Summary
+        lines.append(f"\nSummary: {len(self.issues)} errors, {len(self.warnings)} warnings")
+        sys.stdout.write('\n'.join(lines) + '\n')
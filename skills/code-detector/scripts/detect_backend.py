@@ -4,203 +4,264 @@ Backend Code Detector
 Analyzes Go backend code for schema compliance
 """
 
-import json
-import os
 import re
-import sys
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Any
-
-class BackendDetector:
-    def __init__(self, backend_dir: str, schema_path: str):
+from typing import Dict, List, Any, Tuple
+from common import (RESERVED_KEYS, SourceDetector, dump_results, load_entity, search_word,
+                    to_pascal_case)
+
+# Schema field type -> Ent type
+_ENT_TYPE_MAP = {
+    'string': 'field.String',
+    'text': 'field.Text',
+    'integer': 'field.Int',
+    'number': 'field.Float',
+    'boolean': 'field.Bool',
+    'enum': 'field.Enum',
+    'datetime': 'field.Time',
+    'password': 'field.String',
+    'uid': 'field.String',
+    'version': 'field.Int',
+    'json': 'field.JSON',
+}
+
+@dataclass
+class EntityFields:
+    """An entity's properties bucketed once for all backend checks"""
+    required: List[str]
+    optional: List[str]
+    emails: List[str]             # fields that need email validation
+    typed: List[Tuple[str, str]]  # (field, Ent field type)
+    many2one: List[str]
+    many2many: List[str]
+    has_password: bool
+    soft_delete: bool
+
+class BackendDetector(SourceDetector):
+    # CRUD endpoints every controller should implement
+    CONTROLLER_ENDPOINTS = ['Create', 'Get', 'Update', 'Delete', 'List']
+
+    # Report line for each result code
+    MESSAGES = {
+        'DTO_FILE_MISSING': "❌ DTO file missing: {detail}",
+        'MISSING_DTO_FIELD': "❌ {entity} DTO: Missing required field '{detail}'",
+        'MISSING_EMAIL_VALIDATION': "⚠️  {entity} DTO: Missing email validation for '{detail}'",
+        'PASSWORD_NOT_SENSITIVE': "⚠️  {entity} DTO: Password field should be marked sensitive",
+        'SERVICE_FILE_MISSING': "❌ Service file missing: {detail}",
+        'MISSING_PASSWORD_HASHING': "❌ {entity} Service: Missing password hashing",
+        'UNGUARDED_OPTIONAL_FIELD': "⚠️  {entity} Service: Optional field '{detail}' should be checked before setting",
+        'MISSING_MANY2ONE': "⚠️  {entity} Service: Missing relationship handling for '{detail}'",
+        'MISSING_MANY2MANY': "⚠️  {entity} Service: Missing many2many relationship for '{detail}'",
+        'CONTROLLER_FILE_MISSING': "❌ Controller file missing: {detail}",
+        'MISSING_CONTROLLER_ERROR_HANDLING': "⚠️  {entity} Controller: Missing proper error handling",
+        'MISSING_JSON_BINDING': "❌ {entity} Controller: Missing JSON binding validation",
+        'MISSING_ENDPOINT': "⚠️  {entity} Controller: Missing {detail} endpoint",
+        'MODULE_FILE_MISSING': "⚠️  {entity} Module: File missing (optional)",
+        'MISSING_ROUTE_REGISTRATION': "⚠️  {entity} Module: Missing route registration",
+        'SCHEMA_FILE_MISSING': "⚠️  {entity} Schema: File missing (optional)",
+        'FIELD_TYPE_MISMATCH': "⚠️  {entity} Schema: Field '{detail}' type mismatch",
+        'MISSING_SOFT_DELETE': "⚠️  {entity} Schema: Missing soft delete field",
+    }
+
+    def __init__(self, backend_dir: str, schema_path: str = None, *, schema: Dict = None):
+        super().__init__(schema_path, schema=schema)
         self.backend_dir = Path(backend_dir)
-        self.schema = self._load_schema(schema_path)
-        self.issues = []
-        self.warnings = []
-
-    def _load_schema(self, path: str) -> Dict:
-        with open(path, 'r') as f:
-            return json.load(f)
 
-    def analyze_entity(self, entity_name: str):
+    def _classify(self, entity: str) -> EntityFields:
+        """Bucket an entity's properties by what the checks look for"""
+        fields = self._classified.get(entity)
+        if fields is None:
+            definition = self.schema.get(entity, {})
+            properties = definition.get('properties', {})
+            fields = EntityFields(
+                required=[], optional=[], emails=[], typed=[], many2one=[], many2many=[],
+                has_password=any('password' in k.lower() for k in properties),
+                soft_delete=bool(definition.get('softDelete')),
+            )
+            for prop_name, prop_def in properties.items():
+                validations = prop_def.get('validate', {})
+                if validations.get('required'):
+                    fields.required.append(prop_name)
+                else:
+                    fields.optional.append(prop_name)
+                if 'email' in validations or prop_name.lower() == 'email':
+                    fields.emails.append(prop_name)
+                expected = self._map_to_ent_type(prop_def.get('type'))
+                if expected:
+                    fields.typed.append((prop_name, expected))
+                if '$ref' in prop_def:
+                    rel_type = prop_def.get('x-relation', {}).get('type', '')
+                    if rel_type == 'many2One':
+                        fields.many2one.append(prop_name)
+                    elif rel_type == 'many2Many':
+                        fields.many2many.append(prop_name)
+            self._classified[entity] = fields
+        return fields
+
+    def analyze_entity(self, entity_name: str, print_results: bool = True):
         """Analyze all components for an entity"""
-        print(f"\n=== Analyzing {entity_name} ===")
-
         self._check_dto(entity_name)
         self._check_service(entity_name)
         self._check_controller(entity_name)
         self._check_module(entity_name)
         self._check_schema(entity_name)
 
-        self._print_results()
+        if print_results:
+            self._print_results(entity_name)
 
     def _check_dto(self, entity: str):
         """Check DTO file"""
         dto_file = self.backend_dir / entity.lower() / "dto.go"
-        if not dto_file.exists():
-            self.issues.append(f"❌ DTO file missing: {dto_file}")
+        if not self._exists(dto_file):
+            self.issues.append(('DTO_FILE_MISSING', entity, str(dto_file)))
             return
 
-        content = dto_file.read_text()
-        properties = self.schema.get(entity, {}).get('properties', {})
+        content = self._read(dto_file)
+        fields = self._classify(entity)
 
         # Check CreateDTO
-        for prop_name, prop_def in properties.items():
-            if prop_def.get('validate', {}).get('required'):
-                # Check if field exists in CreateDTO
-                pattern = rf'{self._to_pascal_case(prop_name)}\s+[\w\*]+'
-                if not re.search(pattern, content):
-                    self.issues.append(f"❌ {entity} DTO: Missing required field '{prop_name}'")
+        if fields.required:
+            # One pass over the file collects every declared required field
+            pattern = self._get_dto_fields_pattern(entity, fields.required)
+            found = set()
+            match = search_word(pattern, content)
+            while match:
+                found.add(match.group(1).decode())
+                match = search_word(pattern, content, match.end())
+            for prop_name in fields.required:
+                if to_pascal_case(prop_name) not in found:
+                    self.issues.append(('MISSING_DTO_FIELD', entity, prop_name))
 
         # Check validation tags
-        for prop_name, prop_def in properties.items():
-            validations = prop_def.get('validate', {})
-            if 'email' in validations or prop_name.lower() == 'email':
-                if 'validate:"email"' not in content:
-                    self.warnings.append(f"⚠️  {entity} DTO: Missing email validation for '{prop_name}'")
+        if fields.emails and content.find(b'validate:"email"') == -1:
+            for prop_name in fields.emails:
+                self.warnings.append(('MISSING_EMAIL_VALIDATION', entity, prop_name))
 
         # Check password hashing
-        if any('password' in k.lower() for k in properties.keys()):
-            if 'Sensitive()' not in content:
-                self.warnings.append(f"⚠️  {entity} DTO: Password field should be marked sensitive")
+        if fields.has_password:
+            if content.find(b'Sensitive()') == -1:
+                self.warnings.append(('PASSWORD_NOT_SENSITIVE', entity, None))
 
     def _check_service(self, entity: str):
         """Check Service implementation"""
         service_file = self.backend_dir / entity.lower() / "service.go"
-        if not service_file.exists():
-            self.issues.append(f"❌ Service file missing: {service_file}")
+        if not self._exists(service_file):
+            self.issues.append(('SERVICE_FILE_MISSING', entity, str(service_file)))
             return
 
-        content = service_file.read_text()
-        properties = self.schema.get(entity, {}).get('properties', {})
+        content = self._read(service_file)
+        fields = self._classify(entity)
 
         # Check password hashing
-        if any('password' in k.lower() for k in properties.keys()):
-            if 'bcrypt.GenerateFromPassword' not in content:
-                self.issues.append(f"❌ {entity} Service: Missing password hashing")
+        if fields.has_password:
+            if content.find(b'bcrypt.GenerateFromPassword') == -1:
+                self.issues.append(('MISSING_PASSWORD_HASHING', entity, None))
 
         # Check optional field handling
-        for prop_name, prop_def in properties.items():
-            if not prop_def.get('validate', {}).get('required'):
-                # Should check before setting
-                pattern = rf'Set{self._to_pascal_case prop_name)}\(dto\.{self._to_pascal_case(prop_name)}\)'
-                if re.search(pattern, content):
-                    # Check if there's a condition
-                    lines = content.split('\n')
-                    for i, line in enumerate(lines):
-                        if pattern in line:
-                            # Check previous line for condition
-                            if i > 0 and 'if' not in lines[i-1]:
-                                self.warnings.append(f"⚠️  {entity} Service: Optional field '{prop_name}' should be checked before setting")
+        if fields.optional:
+            # Optional fields should be checked before setting: a setter whose
+            # previous line has no condition is unguarded
+            unguarded = set()
+            pattern = self._get_setters_pattern(entity, fields.optional)
+            match = search_word(pattern, content)
+            while match:
+                line_start = content.rfind(b'\n', 0, match.start()) + 1
+                if line_start > 0:
+                    prev_start = content.rfind(b'\n', 0, line_start - 1) + 1
+                    if b'if' not in content[prev_start:line_start - 1]:
+                        unguarded.add(match.group(1).decode())
+                match = search_word(pattern, content, match.end())
+            for prop_name in fields.optional:
+                if to_pascal_case(prop_name) in unguarded:
+                    self.warnings.append(('UNGUARDED_OPTIONAL_FIELD', entity, prop_name))
 
         # Check relationships
-        for prop_name, prop_def in properties.items():
-            if '$ref' in prop_def:
-                rel_type = prop_def.get('x-relation', {}).get('type', '')
-                if rel_type == 'many2One':
-                    if f'Set{self._to_pascal_case(prop_name)}ID' not in content:
-                        self.warnings.append(f"⚠️  {entity} Service: Missing relationship handling for '{prop_name}'")
-                elif rel_type == 'many2Many':
-                    if f'Add{self._to_pascal_case(prop_name)}IDs' not in content:
-                        self.warnings.append(f"⚠️  {entity} Service: Missing many2many relationship for '{prop_name}'")
+        for prop_name in fields.many2one:
+            if content.find(f'Set{to_pascal_case(prop_name)}ID'.encode()) == -1:
+                self.warnings.append(('MISSING_MANY2ONE', entity, prop_name))
+        for prop_name in fields.many2many:
+            if content.find(f'Add{to_pascal_case(prop_name)}IDs'.encode()) == -1:
+                self.warnings.append(('MISSING_MANY2MANY', entity, prop_name))
+
+    def _get_dto_fields_pattern(self, entity: str, fields: List[str]) -> re.Pattern:
+        """Return the compiled pattern matching any of an entity's DTO fields"""
+        key = ('dto', entity)
+        pattern = self._pattern_cache.get(key)
+        if pattern is None:
+            names = '|'.join(re.escape(to_pascal_case(field)) for field in fields)
+            pattern = re.compile(rf'({names})\s+[\w\*]+'.encode())
+            self._pattern_cache[key] = pattern
+        return pattern
+
+    def _get_setters_pattern(self, entity: str, fields: List[str]) -> re.Pattern:
+        """Return the compiled pattern matching any of an entity's ent setters"""
+        key = ('setter', entity)
+        pattern = self._pattern_cache.get(key)
+        if pattern is None:
+            names = '|'.join(re.escape(to_pascal_case(field)) for field in fields)
+            pattern = re.compile(rf'Set({names})\(dto\.\1\)'.encode())
+            self._pattern_cache[key] = pattern
+        return pattern
 
     def _check_controller(self, entity: str):
         """Check Controller implementation"""
         controller_file = self.backend_dir / entity.lower() / "controller.go"
-        if not controller_file.exists():
-            self.issues.append(f"❌ Controller file missing: {controller_file}")
+        if not self._exists(controller_file):
+            self.issues.append(('CONTROLLER_FILE_MISSING', entity, str(controller_file)))
             return
 
-        content = controller_file.read_text()
+        content = self._read(controller_file)
 
         # Check error handling
-        if 'res.WriteError' not in content:
-            self.warnings.append(f"⚠️  {entity} Controller: Missing proper error handling")
+        if content.find(b'res.WriteError') == -1:
+            self.warnings.append(('MISSING_CONTROLLER_ERROR_HANDLING', entity, None))
 
         # Check JSON binding
-        if 'binding.JSON' not in content:
-            self.issues.append(f"❌ {entity} Controller: Missing JSON binding validation")
+        if content.find(b'binding.JSON') == -1:
+            self.issues.append(('MISSING_JSON_BINDING', entity, None))
 
         # Check CRUD endpoints
-        required_endpoints = ['Create', 'Get', 'Update', 'Delete', 'List']
-        for endpoint in required_endpoints:
-            if f'func (c *Controller) {endpoint}' not in content:
-                self.warnings.append(f"⚠️  {entity} Controller: Missing {endpoint} endpoint")
+        for endpoint in self.CONTROLLER_ENDPOINTS:
+            if content.find(f'func (c *Controller) {endpoint}'.encode()) == -1:
+                self.warnings.append(('MISSING_ENDPOINT', entity, endpoint))
 
     def _check_module(self, entity: str):
         """Check Module file"""
         module_file = self.backend_dir / entity.lower() / "module.go"
-        if not module_file.exists():
-            self.warnings.append(f"⚠️  {entity} Module: File missing (optional)")
+        if not self._exists(module_file):
+            self.warnings.append(('MODULE_FILE_MISSING', entity, None))
             return
 
-        content = module_file.read_text()
+        content = self._read(module_file)
 
         # Check route registration
-        if 'r.Route' not in content:
-            self.warnings.append(f"⚠️  {entity} Module: Missing route registration")
+        if content.find(b'r.Route') == -1:
+            self.warnings.append(('MISSING_ROUTE_REGISTRATION', entity, None))
 
     def _check_schema(self, entity: str):
         """Check Ent schema file"""
         schema_file = self.backend_dir / entity.lower() / "schema.go"
-        if not schema_file.exists():
-            self.warnings.append(f"⚠️  {entity} Schema: File missing (optional)")
+        if not self._exists(schema_file):
+            self.warnings.append(('SCHEMA_FILE_MISSING', entity, None))
             return
 
-        content = schema_file.read_text()
-        properties = self.schema.get(entity, {}).get('properties', {})
+        content = self._read(schema_file)
+        fields = self._classify(entity)
 
         # Check field definitions
-        for prop_name, prop_def in properties.items():
-            field_type = prop_def.get('type')
-            if field_type:
-                expected = self._map_to_ent_type(field_type)
-                if expected and expected not in content:
-                    self.warnings.append(f"⚠️  {entity} Schema: Field '{prop_name}' type mismatch")
+        for prop_name, expected in fields.typed:
+            if content.find(expected.encode()) == -1:
+                self.warnings.append(('FIELD_TYPE_MISMATCH', entity, prop_name))
 
         # Check soft delete
-        if self.schema.get(entity, {}).get('softDelete'):
-            if 'deleted_at' not in content:
-                self.warnings.append(f"⚠️  {entity} Schema: Missing soft delete field")
-
-    def _print_results(self):
-        """Print analysis results"""
-        if self.issues:
-            print("\n❌ Issues Found:")
-            for issue in self.issues:
-                print(f"  {issue}")
-
-        if self.warnings:
-            print("\n⚠️  Warnings:")
-            for warning in self.warnings:
-                print(f"  {warning}")
-
-        if not self.issues and not self.warnings:
-            print("\n✅ All checks passed!")
-
-        # Summary
-        print(f"\nSummary: {len(self.issues)} errors, {len(self.warnings)} warnings")
-
-    def _to_pascal_case(self, name: str) -> str:
-        """Convert field name to PascalCase"""
-        return ''.join(word.capitalize() for word in name.split('_'))
+        if fields.soft_delete:
+            if content.find(b'deleted_at') == -1:
+                self.warnings.append(('MISSING_SOFT_DELETE', entity, None))
 
     def _map_to_ent_type(self, field_type: str) -> str:
         """Map schema type to Ent type"""
-        mapping = {
-            'string': 'field.String',
-            'text': 'field.Text',
-            'integer': 'field.Int',
-            'number': 'field.Float',
-            'boolean': 'field.Bool',
-            'enum': 'field.Enum',
-            'datetime': 'field.Time',
-            'password': 'field.String',
-            'uid': 'field.String',
-            'version': 'field.Int',
-            'json': 'field.JSON',
-        }
-        return mapping.get(field_type, '')
+        return _ENT_TYPE_MAP.get(field_type, '')
 
 def main():
     import argparse
@@ -209,21 +270,31 @@ def main():
     parser.add_argument('backend_dir', help='Backend directory path')
     parser.add_argument('--schema', required=True, help='Schema file path')
     parser.add_argument('--entity', help='Specific entity to analyze')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
 
     args = parser.parse_args()
 
-    detector = BackendDetector(args.backend_dir, args.schema)
-
     if args.entity:
-        detector.analyze_entity(args.entity)
+        # Only the requested entity is parsed out of the schema file
+        schema = {args.entity: load_entity(args.schema, args.entity)}
+        detector = BackendDetector(args.backend_dir, schema=schema)
+        entities = [args.entity]
     else:
         # Analyze all entities
-        schema = detector.schema
-        for entity_name in schema.keys():
-            if entity_name not in ['presets', 'features']:
-                detector.analyze_entity(entity_name)
-                detector.issues = []
-                detector.warnings = []
+        detector = BackendDetector(args.backend_dir, args.schema)
+        entities = [k for k in detector.schema if k not in RESERVED_KEYS]
+
+    issues = []
+    warnings = []
+    for entity_name in entities:
+        detector.analyze_entity(entity_name, print_results=not args.json)
+        issues.extend(detector.issues)
+        warnings.extend(detector.warnings)
+        detector.issues.clear()
+        detector.warnings.clear()
+
+    if args.json:
+        print(dump_results(issues, warnings))
 
 if __name__ == '__main__':
     main()